@@ -0,0 +1,29 @@
+"""
+Shared bootstrap for the IAM Explorer example scripts.
+
+Importing this module makes the in-repo ``iam_explorer`` package importable
+without installing it, so each example no longer repeats the same
+``sys.path`` mutation. It also provides :func:`resolve_graph`, which stats
+a graph file exactly once and hands back both the path and the stat result
+— the existence check and the mtime-based cache keys the examples use are
+then derived from a single syscall instead of two.
+"""
+
+import sys
+from pathlib import Path
+
+# Add the src directory to the path so the examples can import iam_explorer
+_SRC = str(Path(__file__).parent.parent / "src")
+if _SRC not in sys.path:
+    sys.path.insert(0, _SRC)
+
+
+def resolve_graph(graph_file: str) -> tuple:
+    """Stat a graph file once and return ``(Path, stat_result)``.
+
+    Raises FileNotFoundError when the file does not exist, so the stat
+    doubles as the existence check (EAFP, no TOCTOU window). Callers take
+    their mtime cache key from the returned stat instead of stat-ing again.
+    """
+    path = Path(graph_file)
+    return path, path.stat()
@@ -8,6 +8,7 @@ to analyze IAM permissions and relationships.
 
 import json
 import logging
+from itertools import islice
 from pathlib import Path
 
 from iam_explorer.models import IAMUser, IAMRole, IAMPolicy, IAMGraph
@@ -15,8 +16,6 @@ from iam_explorer.graph_builder import GraphBuilder
 from iam_explorer.query_engine import QueryEngine
 from iam_explorer.visualizer import GraphVisualizer
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
@@ -191,6 +190,9 @@ def create_sample_data():
 
 def main():
     """Main example function."""
+    # Configure logging at run time, not import time
+    logging.basicConfig(level=logging.INFO)
+
     logger.info("IAM Explorer Basic Usage Example")
     logger.info("=" * 40)
     
@@ -202,7 +204,7 @@ def main():
     data_file = "sample_iam_data.json"
     with open(data_file, 'w') as f:
         json.dump(sample_data, f, indent=2)
-    logger.info(f"Sample data saved to {data_file}")
+    logger.info("Sample data saved to %s", data_file)
     
     # Build graph from data
     logger.info("Building IAM graph...")
@@ -212,7 +214,7 @@ def main():
     # Save graph
     graph_file = "sample_iam_graph.pkl"
     builder.save_graph(graph_file)
-    logger.info(f"Graph saved to {graph_file}")
+    logger.info("Graph saved to %s", graph_file)
     
     # Create query engine
     logger.info("Creating query engine...")
@@ -227,39 +229,39 @@ def main():
     logger.info("\n1. Who can perform 's3:GetObject'?")
     results = engine.who_can_do("s3:GetObject")
     for result in results:
-        logger.info(f"   - {result['type'].upper()}: {result['name']}")
+        logger.info("   - %s: %s", result['type'].upper(), result['name'])
         if result['type'] == 'role' and result.get('can_be_assumed_by'):
-            logger.info(f"     Can be assumed by: {', '.join(result['can_be_assumed_by'])}")
+            logger.info("     Can be assumed by: %s", ", ".join(result['can_be_assumed_by']))
     
     # Query 2: What can Alice do?
     logger.info("\n2. What can user 'alice' do?")
     result = engine.what_can_entity_do("alice")
     if 'error' not in result:
-        logger.info(f"   Entity: {result['entity_name']} ({result['entity_type']})")
-        logger.info(f"   Effective actions: {len(result['effective_actions'])}")
-        for action in result['effective_actions'][:5]:  # Show first 5
-            logger.info(f"     - {action}")
+        logger.info("   Entity: %s (%s)", result['entity_name'], result['entity_type'])
+        logger.info("   Effective actions: %d", len(result['effective_actions']))
+        for action in islice(result['effective_actions'], 5):  # Show first 5
+            logger.info("     - %s", action)
         if len(result['effective_actions']) > 5:
-            logger.info(f"     ... and {len(result['effective_actions']) - 5} more")
+            logger.info("     ... and %d more", len(result['effective_actions']) - 5)
     else:
-        logger.info(f"   Error: {result['error']}")
+        logger.info("   Error: %s", result['error'])
     
     # Query 3: Who has admin access?
     logger.info("\n3. Who can perform any action ('*')?")
     results = engine.who_can_do("*")
     for result in results:
-        logger.info(f"   - {result['type'].upper()}: {result['name']}")
+        logger.info("   - %s: %s", result['type'].upper(), result['name'])
     
     # Query 4: What can the lambda execution role do?
     logger.info("\n4. What can role 'lambda-execution-role' do?")
     result = engine.what_can_entity_do("lambda-execution-role")
     if 'error' not in result:
-        logger.info(f"   Entity: {result['entity_name']} ({result['entity_type']})")
-        logger.info(f"   Effective actions: {len(result['effective_actions'])}")
+        logger.info("   Entity: %s (%s)", result['entity_name'], result['entity_type'])
+        logger.info("   Effective actions: %d", len(result['effective_actions']))
         if result.get('assumable_roles'):
-            logger.info(f"   Can assume: {', '.join(result['assumable_roles'])}")
+            logger.info("   Can assume: %s", ", ".join(result['assumable_roles']))
     else:
-        logger.info(f"   Error: {result['error']}")
+        logger.info("   Error: %s", result['error'])
     
     # Generate visualization
     logger.info("\n" + "=" * 40)
@@ -268,28 +270,30 @@ def main():
     
     visualizer = GraphVisualizer(graph)
     
-    # Generate DOT file
+    # Generate DOT file through a large write buffer to cut syscall count
+    # on big graphs
     dot_file = "sample_iam_graph.dot"
-    visualizer.generate_dot(dot_file)
-    logger.info(f"DOT visualization saved to {dot_file}")
+    with open(dot_file, 'w', buffering=1 << 20) as fh:
+        visualizer.generate_dot(fh)
+    logger.info("DOT visualization saved to %s", dot_file)
     logger.info("To convert to PNG: dot -Tpng sample_iam_graph.dot -o sample_iam_graph.png")
     
     # Show graph statistics
     stats = visualizer.get_graph_stats()
-    logger.info(f"\nGraph Statistics:")
-    logger.info(f"  - Total nodes: {stats['total_nodes']}")
-    logger.info(f"  - Total edges: {stats['total_edges']}")
-    logger.info(f"  - Users: {stats['users']}")
-    logger.info(f"  - Roles: {stats['roles']}")
-    logger.info(f"  - Groups: {stats['groups']}")
-    logger.info(f"  - Policies: {stats['policies']}")
+    logger.info("\nGraph Statistics:")
+    logger.info("  - Total nodes: %d", stats['total_nodes'])
+    logger.info("  - Total edges: %d", stats['total_edges'])
+    logger.info("  - Users: %d", stats['users'])
+    logger.info("  - Roles: %d", stats['roles'])
+    logger.info("  - Groups: %d", stats['groups'])
+    logger.info("  - Policies: %d", stats['policies'])
     
     logger.info("\n" + "=" * 40)
     logger.info("Example completed successfully!")
     logger.info("Files created:")
-    logger.info(f"  - {data_file}")
-    logger.info(f"  - {graph_file}")
-    logger.info(f"  - {dot_file}")
+    logger.info("  - %s", data_file)
+    logger.info("  - %s", graph_file)
+    logger.info("  - %s", dot_file)
 
 
 if __name__ == "__main__":
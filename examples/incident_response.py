@@ -7,40 +7,154 @@ such as analyzing compromised accounts and understanding blast radius.
 """
 
 import json
+import logging
+import re
 import sys
 from datetime import datetime
 from pathlib import Path
 
-# Add the src directory to the path so we can import iam_explorer
-sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+# _bootstrap adds the src directory to the path so we can import iam_explorer
+from _bootstrap import resolve_graph
+
+import networkx as nx
 
 from iam_explorer.graph_builder import GraphBuilder
+from iam_explorer.models import IAMGraph
 from iam_explorer.query_engine import QueryEngine
 from iam_explorer.visualizer import GraphVisualizer
 
+logger = logging.getLogger(__name__)
+
+# Optional import for fast JSON serialization
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+    orjson = None
+
+# One compiled pattern classifies an action's service family in a single
+# scan; the group names double as dangerous_patterns bucket keys so a match
+# dispatches straight to its bucket via lastgroup
+_SERVICE_PATTERN = re.compile(
+    r'^(?:(?P<iam_management>iam):'
+    r'|(?P<data_access>s3|dynamodb|rds):'
+    r'|(?P<compute_control>ec2|lambda|ecs):'
+    r'|(?P<secrets_access>secretsmanager|ssm|kms):)'
+)
+
+
+def _dump_json(obj: dict, path: str):
+    """Write a report as pretty-printed JSON, using orjson when available."""
+    if HAS_ORJSON:
+        Path(path).write_bytes(orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+    else:
+        # ensure_ascii=False writes the emoji-laden status strings as
+        # UTF-8 instead of escaping every codepoint to \uXXXX pairs
+        with open(path, 'w') as f:
+            json.dump(obj, f, indent=2, ensure_ascii=False)
+
+
+# Loaded graphs keyed by (absolute path, mtime) so analyzing several
+# entities in one process unpickles and indexes the graph only once
+_GRAPH_CACHE = {}
+
 
 def load_graph(graph_file: str) -> tuple:
-    """Load IAM graph and return query engine and visualizer."""
-    if not Path(graph_file).exists():
+    """Load IAM graph and return query engine and the raw graph.
+
+    The visualizer is deliberately not built here: it is only needed for
+    the final DOT export, so callers construct it at that point and early
+    exits (e.g. entity not found) skip its setup entirely.
+    """
+    # One stat serves both the existence check and the mtime cache key
+    try:
+        path, stat = resolve_graph(graph_file)
+    except FileNotFoundError:
         print(f"❌ Graph file '{graph_file}' not found.")
         print("Run: iam-explorer fetch && iam-explorer build-graph")
         sys.exit(1)
-    
+
+    cache_key = (str(path.absolute()), stat.st_mtime)
+    if cache_key in _GRAPH_CACHE:
+        return _GRAPH_CACHE[cache_key]
+
     builder = GraphBuilder()
     graph = builder.load_graph(graph_file)
     engine = QueryEngine(graph)
-    visualizer = GraphVisualizer(graph)
-    
-    return engine, visualizer
+    # One up-front policy scan so who_can_do queries skip principals that
+    # cannot match
+    engine.build_action_index()
 
+    _GRAPH_CACHE[cache_key] = (engine, graph)
+    return engine, graph
+
+
+def _ego_subgraph(graph: IAMGraph, entity_name: str, radius: int = 2) -> IAMGraph:
+    """Restrict a graph to an entity's ego network for visualization.
+
+    DOT export then scales with the blast-radius neighborhood rather than
+    the full account graph. Falls back to the full graph when the entity
+    cannot be resolved.
+    """
+    entity = graph.get_entity_by_name(entity_name)
+    if entity is None:
+        return graph
+
+    sub = nx.ego_graph(graph.graph, entity.arn, radius=radius, undirected=True)
+
+    ego = IAMGraph()
+    ego.graph = sub
+    ego.users = {arn: e for arn, e in graph.users.items() if arn in sub}
+    ego.roles = {arn: e for arn, e in graph.roles.items() if arn in sub}
+    ego.groups = {arn: e for arn, e in graph.groups.items() if arn in sub}
+    ego.policies = {arn: e for arn, e in graph.policies.items() if arn in sub}
+    return ego
+
+
+def _classify_actions(effective_actions: list) -> dict:
+    """Bucket an entity's effective actions into dangerous-permission groups.
+
+    Each action is scanned once by the compiled service pattern, whose
+    matching group name selects the bucket, plus C-level substring checks
+    for Delete/Create — one pass instead of one scan per category.
+    """
+    dangerous_patterns = {
+        "admin_access": ["*"],
+        "iam_management": [],
+        "data_access": [],
+        "compute_control": [],
+        "delete_permissions": [],
+        "create_permissions": [],
+        "secrets_access": []
+    }
+
+    for action in effective_actions:
+        match = _SERVICE_PATTERN.match(action)
+        if match:
+            dangerous_patterns[match.lastgroup].append(action)
+        if "Delete" in action:
+            dangerous_patterns["delete_permissions"].append(action)
+        if "Create" in action:
+            dangerous_patterns["create_permissions"].append(action)
+
+    return dangerous_patterns
+
+
+def analyze_compromised_entity(engine: QueryEngine, entity_name: str,
+                               entity_analysis: dict = None,
+                               generated_at: str = None) -> dict:
+    """Analyze a potentially compromised entity.
+
+    Pass a precomputed what_can_entity_do result as entity_analysis to
+    avoid re-resolving the entity's permissions.
+    """
+    logger.info("🚨 Analyzing potentially compromised entity: %s", entity_name)
 
-def analyze_compromised_entity(engine: QueryEngine, entity_name: str) -> dict:
-    """Analyze a potentially compromised entity."""
-    print(f"🚨 Analyzing potentially compromised entity: {entity_name}")
-    
     # Get entity permissions
-    entity_analysis = engine.what_can_entity_do(entity_name)
-    
+    if entity_analysis is None:
+        entity_analysis = engine.what_can_entity_do(entity_name)
+
     if 'error' in entity_analysis:
         return {"error": f"Entity '{entity_name}' not found"}
     
@@ -48,7 +162,7 @@ def analyze_compromised_entity(engine: QueryEngine, entity_name: str) -> dict:
         "entity_name": entity_name,
         "entity_type": entity_analysis["entity_type"],
         "entity_arn": entity_analysis["entity_arn"],
-        "analysis_timestamp": datetime.now().isoformat(),
+        "analysis_timestamp": generated_at or datetime.now().isoformat(),
         "blast_radius": {},
         "risk_assessment": {},
         "immediate_actions": [],
@@ -60,15 +174,7 @@ def analyze_compromised_entity(engine: QueryEngine, entity_name: str) -> dict:
     analysis["blast_radius"]["total_permissions"] = len(effective_actions)
     
     # Categorize dangerous permissions
-    dangerous_patterns = {
-        "admin_access": ["*"],
-        "iam_management": [action for action in effective_actions if action.startswith("iam:")],
-        "data_access": [action for action in effective_actions if any(service in action for service in ["s3:", "dynamodb:", "rds:"])],
-        "compute_control": [action for action in effective_actions if any(service in action for service in ["ec2:", "lambda:", "ecs:"])],
-        "delete_permissions": [action for action in effective_actions if "Delete" in action],
-        "create_permissions": [action for action in effective_actions if "Create" in action],
-        "secrets_access": [action for action in effective_actions if any(service in action for service in ["secretsmanager:", "ssm:", "kms:"])]
-    }
+    dangerous_patterns = _classify_actions(effective_actions)
     
     analysis["blast_radius"]["dangerous_permissions"] = dangerous_patterns
     
@@ -127,29 +233,38 @@ def analyze_compromised_entity(engine: QueryEngine, entity_name: str) -> dict:
     return analysis
 
 
-def find_lateral_movement_paths(engine: QueryEngine, entity_name: str) -> dict:
-    """Find potential lateral movement paths from compromised entity."""
-    print(f"🔍 Analyzing lateral movement paths from: {entity_name}")
-    
-    entity_analysis = engine.what_can_entity_do(entity_name)
-    
+def find_lateral_movement_paths(engine: QueryEngine, entity_name: str,
+                                entity_analysis: dict = None,
+                                generated_at: str = None) -> dict:
+    """Find potential lateral movement paths from compromised entity.
+
+    Pass a precomputed what_can_entity_do result as entity_analysis to
+    avoid re-resolving the entity's permissions.
+    """
+    logger.info("🔍 Analyzing lateral movement paths from: %s", entity_name)
+
+    if entity_analysis is None:
+        entity_analysis = engine.what_can_entity_do(entity_name)
+
     if 'error' in entity_analysis:
         return {"error": f"Entity '{entity_name}' not found"}
     
     lateral_movement = {
         "source_entity": entity_name,
-        "analysis_timestamp": datetime.now().isoformat(),
+        "analysis_timestamp": generated_at or datetime.now().isoformat(),
         "potential_paths": [],
         "high_value_targets": []
     }
     
-    # Check role assumption capabilities
+    # Check role assumption capabilities; resolve all assumable roles in one
+    # batched query so policies shared between them are expanded once
     assumable_roles = entity_analysis.get("assumable_roles", [])
-    
-    for role in assumable_roles:
-        role_name = role.replace("Role: ", "")
-        role_analysis = engine.what_can_entity_do(role_name)
-        
+    role_names = [role.replace("Role: ", "") for role in assumable_roles]
+    role_analyses = engine.what_can_entities_do(role_names) if role_names else {}
+
+    for role_name in role_names:
+        role_analysis = role_analyses[role_name]
+
         if 'error' not in role_analysis:
             role_permissions = len(role_analysis.get("effective_actions", []))
             
@@ -184,19 +299,29 @@ def find_lateral_movement_paths(engine: QueryEngine, entity_name: str) -> dict:
     return lateral_movement
 
 
-def generate_incident_report(engine: QueryEngine, entity_name: str) -> dict:
+def generate_incident_report(engine: QueryEngine, entity_name: str,
+                             now: datetime = None) -> dict:
     """Generate comprehensive incident response report."""
-    print(f"📋 Generating incident response report for: {entity_name}")
-    
-    # Perform all analyses
-    entity_analysis = analyze_compromised_entity(engine, entity_name)
-    lateral_analysis = find_lateral_movement_paths(engine, entity_name)
+    logger.info("📋 Generating incident response report for: %s", entity_name)
+
+    # One timestamp for the whole report; every nested analysis and the
+    # incident id derive from it
+    now = now or datetime.now()
+    generated_at = now.isoformat()
+
+    # Resolve the entity's permissions once and share the result between
+    # both analyses
+    entity_permissions = engine.what_can_entity_do(entity_name)
+    entity_analysis = analyze_compromised_entity(
+        engine, entity_name, entity_permissions, generated_at)
+    lateral_analysis = find_lateral_movement_paths(
+        engine, entity_name, entity_permissions, generated_at)
     
     # Compile comprehensive report
     report = {
-        "incident_id": f"IAM-{datetime.now().strftime('%Y%m%d-%H%M%S')}",
+        "incident_id": f"IAM-{now.strftime('%Y%m%d-%H%M%S')}",
         "compromised_entity": entity_name,
-        "report_timestamp": datetime.now().isoformat(),
+        "report_timestamp": generated_at,
         "executive_summary": {},
         "detailed_analysis": entity_analysis,
         "lateral_movement": lateral_analysis,
@@ -305,29 +430,36 @@ def main():
         print("Example: python incident_response.py compromised-user")
         sys.exit(1)
     
+    # Progress chatter goes through logging; -v turns it back on
+    verbose = "-v" in sys.argv
+    if verbose:
+        sys.argv.remove("-v")
+    logging.basicConfig(level=logging.INFO if verbose else logging.WARNING)
+
     entity_name = sys.argv[1]
     graph_file = sys.argv[2] if len(sys.argv) > 2 else "iam_graph.pkl"
     
     # Load graph
-    engine, visualizer = load_graph(graph_file)
+    engine, graph = load_graph(graph_file)
     
     # Generate incident report
-    report = generate_incident_report(engine, entity_name)
+    report_ts = datetime.now()
+    report = generate_incident_report(engine, entity_name, now=report_ts)
     
     # Print report
     print_incident_report(report)
     
     # Save detailed report
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    timestamp = report_ts.strftime('%Y%m%d_%H%M%S')
     filename = f"incident_response_{entity_name}_{timestamp}.json"
     
-    with open(filename, 'w') as f:
-        json.dump(report, f, indent=2)
-    
+    _dump_json(report, filename)
+
     print(f"\n💾 Detailed report saved to: {filename}")
     
     # Generate focused visualization
     viz_filename = f"incident_graph_{entity_name}_{timestamp}.dot"
+    visualizer = GraphVisualizer(_ego_subgraph(graph, entity_name))
     visualizer.generate_dot(viz_filename, include_policies=True, filter_entities=[entity_name])
     print(f"📊 Incident graph saved to: {viz_filename}")
     print(f"   Convert to image: dot -Tpng {viz_filename} -o {viz_filename.replace('.dot', '.png')}")
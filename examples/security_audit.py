@@ -8,23 +8,62 @@ using IAM Explorer to identify potential security risks and violations.
 
 import json
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
 from datetime import datetime
-from pathlib import Path
+from operator import itemgetter
 
-# Add the src directory to the path so we can import iam_explorer
-sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+# _bootstrap adds the src directory to the path so we can import iam_explorer
+from _bootstrap import resolve_graph
 
 from iam_explorer.graph_builder import GraphBuilder
 from iam_explorer.query_engine import QueryEngine
 
+# Optional import for fast JSON serialization
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+    orjson = None
+
+
+def _dump_json(obj: dict, path: str):
+    """Write audit results as pretty-printed JSON, using orjson when available."""
+    if HAS_ORJSON:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+    else:
+        # ensure_ascii=False writes the emoji-laden status strings as
+        # UTF-8 instead of escaping every codepoint to \uXXXX pairs
+        with open(path, 'w') as f:
+            json.dump(obj, f, indent=2, ensure_ascii=False)
+
+
+@dataclass(slots=True)
+class Finding:
+    """A single audit finding.
+
+    Slotted instances stay compact when a large account produces
+    thousands of findings; asdict() turns them back into plain dicts for
+    the JSON report.
+    """
+    severity: str
+    category: str
+    description: str
+    recommendation: str
+    entities: list = field(default_factory=list)
+
 
 def load_graph(graph_file: str) -> QueryEngine:
     """Load IAM graph and return query engine."""
-    if not Path(graph_file).exists():
+    try:
+        resolve_graph(graph_file)
+    except FileNotFoundError:
         print(f"❌ Graph file '{graph_file}' not found.")
         print("Run: iam-explorer fetch && iam-explorer build-graph")
         sys.exit(1)
-    
+
     builder = GraphBuilder()
     graph = builder.load_graph(graph_file)
     return QueryEngine(graph)
@@ -41,82 +80,95 @@ def security_audit(engine: QueryEngine) -> dict:
         "statistics": {}
     }
     
+    # The audit queries are read-only and independent, so resolve them all
+    # up front on a thread pool; each section below is then a dict lookup
+    # instead of a fresh graph traversal.
+    actions = ['*', 'iam:*', '*:Delete*', 's3:DeleteBucket',
+               '*:Create*', 'secretsmanager:GetSecretValue', 'kms:Decrypt']
+    with ThreadPoolExecutor(max_workers=len(actions)) as ex:
+        results = dict(zip(actions, ex.map(engine.who_can_do, actions)))
+
+    # Project entity names once per result set; the finding blocks below
+    # reuse these lists instead of re-materializing the same strings
+    names = {action: list(map(itemgetter('name'), entities))
+             for action, entities in results.items()}
+
     # 1. Find all admin users
     print("\n1. Checking for administrative access...")
-    admin_entities = engine.who_can_do('*')
+    admin_entities = results['*']
     audit_results["statistics"]["admin_entities"] = len(admin_entities)
     
     if len(admin_entities) > 5:
-        audit_results["findings"].append({
-            "severity": "HIGH",
-            "category": "Excessive Admin Access",
-            "description": f"Found {len(admin_entities)} entities with administrative access",
-            "entities": [e['name'] for e in admin_entities],
-            "recommendation": "Review and reduce administrative access to essential personnel only"
-        })
+        audit_results["findings"].append(Finding(
+            severity="HIGH",
+            category="Excessive Admin Access",
+            description=f"Found {len(admin_entities)} entities with administrative access",
+            entities=names['*'],
+            recommendation="Review and reduce administrative access to essential personnel only"
+        ))
     
     # 2. Check IAM management permissions
     print("2. Checking IAM management permissions...")
-    iam_managers = engine.who_can_do('iam:*')
+    iam_managers = results['iam:*']
     audit_results["statistics"]["iam_managers"] = len(iam_managers)
     
     if len(iam_managers) > 3:
-        audit_results["findings"].append({
-            "severity": "HIGH",
-            "category": "IAM Management Access",
-            "description": f"Found {len(iam_managers)} entities that can manage IAM",
-            "entities": [e['name'] for e in iam_managers],
-            "recommendation": "Limit IAM management permissions to security team only"
-        })
+        audit_results["findings"].append(Finding(
+            severity="HIGH",
+            category="IAM Management Access",
+            description=f"Found {len(iam_managers)} entities that can manage IAM",
+            entities=names['iam:*'],
+            recommendation="Limit IAM management permissions to security team only"
+        ))
     
     # 3. Check for dangerous delete permissions
     print("3. Checking for dangerous delete permissions...")
-    delete_entities = engine.who_can_do('*:Delete*')
+    delete_entities = results['*:Delete*']
     audit_results["statistics"]["delete_permissions"] = len(delete_entities)
     
     if len(delete_entities) > 10:
-        audit_results["findings"].append({
-            "severity": "MEDIUM",
-            "category": "Broad Delete Permissions",
-            "description": f"Found {len(delete_entities)} entities with delete permissions",
-            "recommendation": "Review delete permissions and implement least privilege"
-        })
+        audit_results["findings"].append(Finding(
+            severity="MEDIUM",
+            category="Broad Delete Permissions",
+            description=f"Found {len(delete_entities)} entities with delete permissions",
+            recommendation="Review delete permissions and implement least privilege"
+        ))
     
     # 4. Check S3 bucket deletion specifically
     print("4. Checking S3 bucket deletion permissions...")
-    s3_delete_bucket = engine.who_can_do('s3:DeleteBucket')
+    s3_delete_bucket = results['s3:DeleteBucket']
     audit_results["statistics"]["s3_delete_bucket"] = len(s3_delete_bucket)
     
     if len(s3_delete_bucket) > 2:
-        audit_results["findings"].append({
-            "severity": "HIGH",
-            "category": "S3 Bucket Deletion",
-            "description": f"Found {len(s3_delete_bucket)} entities that can delete S3 buckets",
-            "entities": [e['name'] for e in s3_delete_bucket],
-            "recommendation": "Restrict S3 bucket deletion to backup/disaster recovery roles only"
-        })
+        audit_results["findings"].append(Finding(
+            severity="HIGH",
+            category="S3 Bucket Deletion",
+            description=f"Found {len(s3_delete_bucket)} entities that can delete S3 buckets",
+            entities=names['s3:DeleteBucket'],
+            recommendation="Restrict S3 bucket deletion to backup/disaster recovery roles only"
+        ))
     
     # 5. Check for cross-service create permissions
     print("5. Checking cross-service create permissions...")
-    create_entities = engine.who_can_do('*:Create*')
+    create_entities = results['*:Create*']
     audit_results["statistics"]["create_permissions"] = len(create_entities)
     
     # 6. Check secrets access
     print("6. Checking secrets access...")
-    secrets_access = engine.who_can_do('secretsmanager:GetSecretValue')
+    secrets_access = results['secretsmanager:GetSecretValue']
     audit_results["statistics"]["secrets_access"] = len(secrets_access)
     
     if len(secrets_access) > 5:
-        audit_results["findings"].append({
-            "severity": "MEDIUM",
-            "category": "Secrets Access",
-            "description": f"Found {len(secrets_access)} entities that can access secrets",
-            "recommendation": "Review secrets access and implement rotation policies"
-        })
+        audit_results["findings"].append(Finding(
+            severity="MEDIUM",
+            category="Secrets Access",
+            description=f"Found {len(secrets_access)} entities that can access secrets",
+            recommendation="Review secrets access and implement rotation policies"
+        ))
     
     # 7. Check KMS key access
     print("7. Checking KMS key access...")
-    kms_access = engine.who_can_do('kms:Decrypt')
+    kms_access = results['kms:Decrypt']
     audit_results["statistics"]["kms_access"] = len(kms_access)
     
     # Generate overall recommendations
@@ -147,16 +199,16 @@ def print_audit_results(results: dict):
         print(f"\n⚠️  Security Findings ({len(results['findings'])}):")
         for i, finding in enumerate(results["findings"], 1):
             severity_emoji = {"HIGH": "🔴", "MEDIUM": "🟡", "LOW": "🟢"}
-            emoji = severity_emoji.get(finding["severity"], "⚪")
+            emoji = severity_emoji.get(finding.severity, "⚪")
             
-            print(f"\n   {i}. {emoji} {finding['category']} ({finding['severity']})")
-            print(f"      {finding['description']}")
-            print(f"      💡 {finding['recommendation']}")
+            print(f"\n   {i}. {emoji} {finding.category} ({finding.severity})")
+            print(f"      {finding.description}")
+            print(f"      💡 {finding.recommendation}")
             
-            if "entities" in finding and len(finding["entities"]) <= 10:
-                print(f"      📋 Entities: {', '.join(finding['entities'])}")
-            elif "entities" in finding:
-                print(f"      📋 Entities: {', '.join(finding['entities'][:5])} ... and {len(finding['entities'])-5} more")
+            if finding.entities and len(finding.entities) <= 10:
+                print(f"      📋 Entities: {', '.join(finding.entities)}")
+            elif finding.entities:
+                print(f"      📋 Entities: {', '.join(finding.entities[:5])} ... and {len(finding.entities)-5} more")
     
     print(f"\n💡 Recommendations:")
     for rec in results["recommendations"]:
@@ -184,13 +236,13 @@ def main():
     
     # Save results to file
     output_file = f"security_audit_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-    with open(output_file, 'w') as f:
-        json.dump(results, f, indent=2)
+    _dump_json({**results, "findings": [asdict(f) for f in results["findings"]]},
+               output_file)
     
     print(f"\n💾 Detailed results saved to: {output_file}")
     
     # Exit with error code if high severity findings
-    high_severity_count = sum(1 for f in results["findings"] if f["severity"] == "HIGH")
+    high_severity_count = sum(1 for f in results["findings"] if f.severity == "HIGH")
     if high_severity_count > 0:
         print(f"\n❌ Audit completed with {high_severity_count} high-severity findings")
         sys.exit(1)
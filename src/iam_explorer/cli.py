@@ -17,10 +17,6 @@ from .query_engine import QueryEngine
 from .visualizer import GraphVisualizer
 
 # Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
 
@@ -34,8 +30,13 @@ def main(verbose: bool):
     This tool helps you understand complex IAM relationships by building a graph of users,
     roles, groups, and policies, then allows you to query permissions and visualize relationships.
     """
+    # Configure logging here rather than at import time so importing the
+    # package never clobbers a library user's logging setup
+    logging.basicConfig(
+        level=logging.DEBUG if verbose else logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
     if verbose:
-        logging.getLogger().setLevel(logging.DEBUG)
         logger.debug("Verbose logging enabled")
 
 
@@ -144,7 +145,11 @@ def who_can_do(action: str, resource: str, graph: str, format: str):
         results = engine.who_can_do(action, resource)
 
         if format == 'json':
-            click.echo(json.dumps(results, indent=2))
+            # Stream straight to stdout instead of materializing the whole
+            # JSON string first; halves peak memory on large result sets
+            json.dump(results, sys.stdout, indent=2)
+            sys.stdout.write('\n')
+            sys.stdout.flush()
         else:
             _display_who_can_do_table(results, action, resource)
 
@@ -184,7 +189,11 @@ def what_can_do(entity_name: str, graph: str, format: str):
             sys.exit(1)
 
         if format == 'json':
-            click.echo(json.dumps(result, indent=2))
+            # Stream straight to stdout instead of materializing the whole
+            # JSON string first
+            json.dump(result, sys.stdout, indent=2)
+            sys.stdout.write('\n')
+            sys.stdout.flush()
         else:
             _display_what_can_do_table(result)
 
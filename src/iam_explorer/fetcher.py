@@ -4,7 +4,11 @@ AWS IAM data fetcher using boto3.
 
 import json
 import logging
-from typing import Dict, List, Optional, Any
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import chain
+from typing import Dict, List, Optional, Any, Set
 from datetime import datetime
 import boto3
 from botocore.exceptions import ClientError, NoCredentialsError
@@ -13,6 +17,30 @@ from botocore.exceptions import ClientError, NoCredentialsError
 
 logger = logging.getLogger(__name__)
 
+# Profiles whose credentials were already validated in this process; the
+# validation is a live API round-trip (~100-300 ms) that repeated fetcher
+# constructions would otherwise pay every time. Set IAM_EXPLORER_REVALIDATE=1
+# to force a fresh check, e.g. after rotating credentials mid-run.
+_validated_profiles: Set[Optional[str]] = set()
+
+
+@lru_cache(maxsize=None)
+def _session(profile_name: Optional[str]) -> boto3.Session:
+    """Return a boto3 session per profile, constructed once per process.
+
+    Session construction parses ~/.aws/config and loads service models,
+    so pooling saves a fixed ~100 ms on every fetcher after the first.
+    """
+    if profile_name:
+        return boto3.Session(profile_name=profile_name)
+    return boto3.Session()
+
+
+@lru_cache(maxsize=None)
+def _iam_client(profile_name: Optional[str], region_name: str):
+    """Return a cached IAM client for a profile/region pair."""
+    return _session(profile_name).client('iam', region_name=region_name)
+
 
 class IAMFetcher:
     """Fetches IAM data from AWS using boto3."""
@@ -34,12 +62,14 @@ class IAMFetcher:
     def _initialize_session(self):
         """Initialize boto3 session and IAM client."""
         try:
-            if self.profile_name:
-                self.session = boto3.Session(profile_name=self.profile_name)
-            else:
-                self.session = boto3.Session()
+            self.session = _session(self.profile_name)
+            self.iam_client = _iam_client(self.profile_name, self.region_name)
 
-            self.iam_client = self.session.client('iam', region_name=self.region_name)
+            # Skip the validation round-trip when this profile already
+            # passed it earlier in the process
+            if (self.profile_name in _validated_profiles
+                    and not os.environ.get('IAM_EXPLORER_REVALIDATE')):
+                return
 
             # Test credentials by trying to list users (safer than get_user)
             try:
@@ -58,29 +88,41 @@ class IAMFetcher:
                     logger.error(f"Error testing AWS credentials: {e}")
                     raise
 
+            _validated_profiles.add(self.profile_name)
+
         except NoCredentialsError:
             logger.error("No AWS credentials found. Please configure your credentials.")
             raise
 
-    def fetch_all_data(self) -> Dict[str, Any]:
+    def fetch_all_data(self, use_authorization_details: bool = True) -> Dict[str, Any]:
         """
         Fetch all IAM data.
 
+        Args:
+            use_authorization_details: Prefer the single
+                GetAccountAuthorizationDetails call over four separate
+                list calls; falls back automatically when the caller
+                lacks that permission.
+
         Returns:
             Dictionary containing all IAM data
         """
         logger.info("Starting to fetch all IAM data...")
 
-        data = {
-            "users": self.fetch_users(),
-            "roles": self.fetch_roles(),
-            "groups": self.fetch_groups(),
-            "policies": self.fetch_policies(),
-            "metadata": {
-                "fetch_time": datetime.now().isoformat(),
-                "profile": self.profile_name,
-                "region": self.region_name
-            }
+        if use_authorization_details:
+            try:
+                data = self.get_authorization_details()
+            except ClientError as e:
+                logger.warning(f"get_account_authorization_details unavailable ({e}); "
+                               "falling back to per-service listing")
+                data = self._fetch_all_by_listing()
+        else:
+            data = self._fetch_all_by_listing()
+
+        data["metadata"] = {
+            "fetch_time": datetime.now().isoformat(),
+            "profile": self.profile_name,
+            "region": self.region_name
         }
 
         logger.info(f"Fetched {len(data['users'])} users, {len(data['roles'])} roles, "
@@ -88,18 +130,149 @@ class IAMFetcher:
 
         return data
 
+    def _fetch_all_by_listing(self) -> Dict[str, Any]:
+        """Fetch each entity kind with its own list call.
+
+        The four fetches are independent, latency-bound API calls and
+        boto3 client methods are thread-safe, so run them concurrently:
+        total wall time drops to roughly the slowest single fetch.
+        """
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            users_future = executor.submit(self.fetch_users)
+            roles_future = executor.submit(self.fetch_roles)
+            groups_future = executor.submit(self.fetch_groups)
+            policies_future = executor.submit(self.fetch_policies)
+
+            return {
+                "users": users_future.result(),
+                "roles": roles_future.result(),
+                "groups": groups_future.result(),
+                "policies": policies_future.result(),
+            }
+
+    def get_authorization_details(self) -> Dict[str, Any]:
+        """Fetch users, roles, groups and policies in one paginated call.
+
+        GetAccountAuthorizationDetails returns every entity together with
+        its attachments and inline policy documents, so the whole account
+        comes back without the per-entity detail round-trips the list
+        based path needs.
+        """
+        logger.info("Fetching account authorization details...")
+
+        paginator = self.iam_client.get_paginator('get_account_authorization_details')
+
+        user_details: List[Dict[str, Any]] = []
+        role_details: List[Dict[str, Any]] = []
+        group_details: List[Dict[str, Any]] = []
+        policy_details: List[Dict[str, Any]] = []
+
+        try:
+            for page in paginator.paginate(
+                    Filter=['User', 'Role', 'Group', 'LocalManagedPolicy'],
+                    PaginationConfig={'PageSize': 1000}):
+                user_details.extend(page.get('UserDetailList', []))
+                role_details.extend(page.get('RoleDetailList', []))
+                group_details.extend(page.get('GroupDetailList', []))
+                policy_details.extend(page.get('Policies', []))
+        except ClientError as e:
+            logger.error(f"Error fetching authorization details: {e}")
+            raise
+
+        return {
+            "users": [self._user_from_detail(d) for d in user_details],
+            "roles": [self._role_from_detail(d) for d in role_details],
+            "groups": [self._group_from_detail(d) for d in group_details],
+            "policies": [self._policy_from_detail(d) for d in policy_details],
+        }
+
+    @staticmethod
+    def _user_from_detail(detail: Dict[str, Any]) -> Dict[str, Any]:
+        """Map a UserDetail entry to the processed user schema."""
+        return {
+            "arn": detail['Arn'],
+            "name": detail['UserName'],
+            "user_id": detail['UserId'],
+            "path": detail['Path'],
+            "create_date": detail['CreateDate'].isoformat(),
+            # Not part of the authorization-details response
+            "password_last_used": None,
+            "attached_policies": [p['PolicyArn'] for p in detail.get('AttachedManagedPolicies', [])],
+            "inline_policies": {
+                p['PolicyName']: p['PolicyDocument'] for p in detail.get('UserPolicyList', [])
+            },
+            "groups": detail.get('GroupList', []),
+            "tags": detail.get('Tags', [])
+        }
+
+    @staticmethod
+    def _role_from_detail(detail: Dict[str, Any]) -> Dict[str, Any]:
+        """Map a RoleDetail entry to the processed role schema."""
+        return {
+            "arn": detail['Arn'],
+            "name": detail['RoleName'],
+            "role_id": detail['RoleId'],
+            "path": detail['Path'],
+            "assume_role_policy": detail.get('AssumeRolePolicyDocument', {}),
+            "create_date": detail['CreateDate'].isoformat(),
+            "max_session_duration": detail.get('MaxSessionDuration', 3600),
+            "attached_policies": [p['PolicyArn'] for p in detail.get('AttachedManagedPolicies', [])],
+            "inline_policies": {
+                p['PolicyName']: p['PolicyDocument'] for p in detail.get('RolePolicyList', [])
+            },
+            "permission_boundary": detail.get('PermissionsBoundary', {}).get('PermissionsBoundaryArn'),
+            "tags": detail.get('Tags', [])
+        }
+
+    @staticmethod
+    def _group_from_detail(detail: Dict[str, Any]) -> Dict[str, Any]:
+        """Map a GroupDetail entry to the processed group schema."""
+        return {
+            "arn": detail['Arn'],
+            "name": detail['GroupName'],
+            "group_id": detail['GroupId'],
+            "path": detail['Path'],
+            "create_date": detail['CreateDate'].isoformat(),
+            "attached_policies": [p['PolicyArn'] for p in detail.get('AttachedManagedPolicies', [])],
+            "inline_policies": {
+                p['PolicyName']: p['PolicyDocument'] for p in detail.get('GroupPolicyList', [])
+            }
+        }
+
+    @staticmethod
+    def _policy_from_detail(detail: Dict[str, Any]) -> Dict[str, Any]:
+        """Map a ManagedPolicyDetail entry to the processed policy schema."""
+        document = {}
+        for version in detail.get('PolicyVersionList', []):
+            if version.get('IsDefaultVersion'):
+                document = version.get('Document', {})
+                break
+        return {
+            "arn": detail['Arn'],
+            "name": detail['PolicyName'],
+            "policy_document": document,
+            "is_aws_managed": detail['Arn'].startswith('arn:aws:iam::aws:'),
+            "description": detail.get('Description'),
+            "create_date": detail['CreateDate'].isoformat(),
+            "update_date": detail['UpdateDate'].isoformat()
+        }
+
     def fetch_users(self) -> List[Dict[str, Any]]:
         """Fetch all IAM users."""
         logger.info("Fetching IAM users...")
-        users = []
 
         try:
             paginator = self.iam_client.get_paginator('list_users')
 
-            for page in paginator.paginate():
-                for user_data in page['Users']:
-                    user = self._process_user(user_data)
-                    users.append(user)
+            # Fuse the pages into one iterator so the list is built in a
+            # single pass without per-page intermediate allocations
+            users = [
+                self._process_user(user_data)
+                for user_data in chain.from_iterable(
+                    page['Users'] for page in paginator.paginate(
+                        PaginationConfig={'PageSize': 1000})
+                )
+            ]
 
             logger.info(f"Fetched {len(users)} users")
             return users
@@ -111,15 +284,17 @@ class IAMFetcher:
     def fetch_roles(self) -> List[Dict[str, Any]]:
         """Fetch all IAM roles."""
         logger.info("Fetching IAM roles...")
-        roles = []
 
         try:
             paginator = self.iam_client.get_paginator('list_roles')
 
-            for page in paginator.paginate():
-                for role_data in page['Roles']:
-                    role = self._process_role(role_data)
-                    roles.append(role)
+            roles = [
+                self._process_role(role_data)
+                for role_data in chain.from_iterable(
+                    page['Roles'] for page in paginator.paginate(
+                        PaginationConfig={'PageSize': 1000})
+                )
+            ]
 
             logger.info(f"Fetched {len(roles)} roles")
             return roles
@@ -131,15 +306,17 @@ class IAMFetcher:
     def fetch_groups(self) -> List[Dict[str, Any]]:
         """Fetch all IAM groups."""
         logger.info("Fetching IAM groups...")
-        groups = []
 
         try:
             paginator = self.iam_client.get_paginator('list_groups')
 
-            for page in paginator.paginate():
-                for group_data in page['Groups']:
-                    group = self._process_group(group_data)
-                    groups.append(group)
+            groups = [
+                self._process_group(group_data)
+                for group_data in chain.from_iterable(
+                    page['Groups'] for page in paginator.paginate(
+                        PaginationConfig={'PageSize': 1000})
+                )
+            ]
 
             logger.info(f"Fetched {len(groups)} groups")
             return groups
@@ -151,16 +328,18 @@ class IAMFetcher:
     def fetch_policies(self) -> List[Dict[str, Any]]:
         """Fetch all IAM policies (customer managed only by default)."""
         logger.info("Fetching IAM policies...")
-        policies = []
 
         try:
             # Fetch customer managed policies
             paginator = self.iam_client.get_paginator('list_policies')
 
-            for page in paginator.paginate(Scope='Local'):  # Only customer managed
-                for policy_data in page['Policies']:
-                    policy = self._process_policy(policy_data)
-                    policies.append(policy)
+            policies = [
+                self._process_policy(policy_data)
+                for policy_data in chain.from_iterable(
+                    page['Policies'] for page in paginator.paginate(
+                        Scope='Local', PaginationConfig={'PageSize': 1000})
+                )
+            ]
 
             logger.info(f"Fetched {len(policies)} customer managed policies")
             return policies
@@ -360,15 +539,17 @@ class IAMFetcher:
     def fetch_aws_managed_policies(self) -> List[Dict[str, Any]]:
         """Fetch AWS managed policies (warning: this can be slow and large)."""
         logger.info("Fetching AWS managed policies...")
-        policies = []
 
         try:
             paginator = self.iam_client.get_paginator('list_policies')
 
-            for page in paginator.paginate(Scope='AWS'):  # AWS managed policies
-                for policy_data in page['Policies']:
-                    policy = self._process_policy(policy_data)
-                    policies.append(policy)
+            policies = [
+                self._process_policy(policy_data)
+                for policy_data in chain.from_iterable(
+                    page['Policies'] for page in paginator.paginate(
+                        Scope='AWS', PaginationConfig={'PageSize': 1000})
+                )
+            ]
 
             logger.info(f"Fetched {len(policies)} AWS managed policies")
             return policies
@@ -5,13 +5,35 @@ Graph builder for IAM relationships using NetworkX.
 import json
 import logging
 import pickle
+import sys
+from dataclasses import fields
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 
 from .models import IAMUser, IAMRole, IAMGroup, IAMPolicy, IAMGraph
 
+# Optional import for compact columnar serialization
+try:
+    import msgpack
+    HAS_MSGPACK = True
+except ImportError:
+    HAS_MSGPACK = False
+    msgpack = None
+
+# Optional import for compressed pickle persistence
+try:
+    import zstandard
+    HAS_ZSTD = True
+except ImportError:
+    HAS_ZSTD = False
+    zstandard = None
+
 logger = logging.getLogger(__name__)
 
+# Entity fields holding datetimes, converted to/from ISO strings in the
+# columnar format
+_DATETIME_FIELDS = {"create_date", "update_date", "password_last_used"}
+
 
 class GraphBuilder:
     """Builds a graph representation of IAM relationships."""
@@ -70,14 +92,27 @@ class GraphBuilder:
             logger.error(f"Error loading data from {filename}: {e}")
             raise
 
+    def _add_entities(self, entities, registry, node_type):
+        """Bulk-register freshly built entities of one kind.
+
+        Feeds the registry dict and the node set in one pass each instead
+        of a per-entity add_* call; fresh AWS listings are unique within
+        their category, so the per-node membership guard is unnecessary.
+        """
+        registry.update((entity.arn, entity) for entity in entities)
+        self.graph.graph.add_nodes_from(
+            (entity.arn, {"type": node_type, "name": entity.name, "data": entity})
+            for entity in entities
+        )
+
     def _create_policies(self, policies_data: List[Dict[str, Any]]):
         """Create policy entities."""
         logger.info(f"Creating {len(policies_data)} policies...")
 
-        for policy_data in policies_data:
-            policy = IAMPolicy(
-                arn=policy_data['arn'],
-                name=policy_data['name'],
+        policies = [
+            IAMPolicy(
+                arn=sys.intern(policy_data['arn']),
+                name=sys.intern(policy_data['name']),
                 policy_document=policy_data['policy_document'],
                 is_aws_managed=policy_data.get('is_aws_managed', False),
                 description=policy_data.get('description'),
@@ -86,16 +121,18 @@ class GraphBuilder:
                 update_date=datetime.fromisoformat(
                     policy_data['update_date']) if policy_data.get('update_date') else None
             )
-            self.graph.add_policy(policy)
+            for policy_data in policies_data
+        ]
+        self._add_entities(policies, self.graph.policies, "policy")
 
     def _create_users(self, users_data: List[Dict[str, Any]]):
         """Create user entities."""
         logger.info(f"Creating {len(users_data)} users...")
 
-        for user_data in users_data:
-            user = IAMUser(
-                arn=user_data['arn'],
-                name=user_data['name'],
+        users = [
+            IAMUser(
+                arn=sys.intern(user_data['arn']),
+                name=sys.intern(user_data['name']),
                 user_id=user_data['user_id'],
                 path=user_data.get('path', '/'),
                 create_date=datetime.fromisoformat(user_data['create_date']) if user_data.get('create_date') else None,
@@ -107,16 +144,18 @@ class GraphBuilder:
                 permission_boundary=user_data.get('permission_boundary'),
                 tags={tag.get('Key', ''): tag.get('Value', '') for tag in user_data.get('tags', [])}
             )
-            self.graph.add_user(user)
+            for user_data in users_data
+        ]
+        self._add_entities(users, self.graph.users, "user")
 
     def _create_roles(self, roles_data: List[Dict[str, Any]]):
         """Create role entities."""
         logger.info(f"Creating {len(roles_data)} roles...")
 
-        for role_data in roles_data:
-            role = IAMRole(
-                arn=role_data['arn'],
-                name=role_data['name'],
+        roles = [
+            IAMRole(
+                arn=sys.intern(role_data['arn']),
+                name=sys.intern(role_data['name']),
                 role_id=role_data['role_id'],
                 path=role_data.get('path', '/'),
                 assume_role_policy=role_data.get('assume_role_policy', {}),
@@ -127,16 +166,18 @@ class GraphBuilder:
                 permission_boundary=role_data.get('permission_boundary'),
                 tags={tag.get('Key', ''): tag.get('Value', '') for tag in role_data.get('tags', [])}
             )
-            self.graph.add_role(role)
+            for role_data in roles_data
+        ]
+        self._add_entities(roles, self.graph.roles, "role")
 
     def _create_groups(self, groups_data: List[Dict[str, Any]]):
         """Create group entities."""
         logger.info(f"Creating {len(groups_data)} groups...")
 
-        for group_data in groups_data:
-            group = IAMGroup(
-                arn=group_data['arn'],
-                name=group_data['name'],
+        groups = [
+            IAMGroup(
+                arn=sys.intern(group_data['arn']),
+                name=sys.intern(group_data['name']),
                 group_id=group_data['group_id'],
                 path=group_data.get('path', '/'),
                 create_date=datetime.fromisoformat(
@@ -144,7 +185,9 @@ class GraphBuilder:
                 attached_policies=group_data.get('attached_policies', []),
                 inline_policies=group_data.get('inline_policies', {})
             )
-            self.graph.add_group(group)
+            for group_data in groups_data
+        ]
+        self._add_entities(groups, self.graph.groups, "group")
 
     def _create_user_relationships(self, users_data: List[Dict[str, Any]]):
         """Create relationships for users."""
@@ -224,23 +267,164 @@ class GraphBuilder:
                 return arn
         return None
 
+    def _intern_entity_strings(self):
+        """Intern entity names and ARNs after unpickling.
+
+        Unpickled strings are fresh allocations, so repeated loads and the
+        name/ARN sets built by downstream queries would otherwise hold
+        duplicate copies; interning makes their hashing and comparisons
+        pointer-based.
+        """
+        for entity_dict in (self.graph.users, self.graph.roles,
+                            self.graph.groups, self.graph.policies):
+            for entity in entity_dict.values():
+                entity.arn = sys.intern(entity.arn)
+                entity.name = sys.intern(entity.name)
+
     def save_graph(self, filename: str):
-        """Save the graph to a pickle file."""
+        """Save the graph to a pickle file; '.zst' adds zstd compression.
+
+        Compression shrinks the file several-fold and usually speeds the
+        next load: decompression is faster than the extra disk reads.
+        Requires the optional zstandard package.
+        """
         try:
-            with open(filename, 'wb') as f:
-                pickle.dump(self.graph, f)
+            if filename.endswith('.zst'):
+                if not HAS_ZSTD:
+                    raise ImportError(
+                        "zstandard is not available. Install it with: pip install zstandard"
+                    )
+                data = pickle.dumps(self.graph, protocol=pickle.HIGHEST_PROTOCOL)
+                with open(filename, 'wb') as f:
+                    f.write(zstandard.ZstdCompressor(level=3).compress(data))
+            else:
+                with open(filename, 'wb') as f:
+                    pickle.dump(self.graph, f, protocol=pickle.HIGHEST_PROTOCOL)
             logger.info(f"Graph saved to {filename}")
         except Exception as e:
             logger.error(f"Error saving graph to {filename}: {e}")
             raise
 
+    def save_graph_columnar(self, filename: str):
+        """Save the graph in a columnar (struct-of-arrays) layout.
+
+        Entities are stored as per-field arrays and edges as index pairs
+        into a shared node list, so loading reconstructs the graph with
+        bulk inserts instead of pickle's per-object dispatch. The payload
+        is encoded with msgpack for '.msgpack' filenames (requires the
+        optional msgpack package) and JSON otherwise.
+        """
+        node_index = {arn: i for i, arn in enumerate(self.graph.graph.nodes())}
+        edge_columns: Dict[str, list] = {"src": [], "dst": [], "type": []}
+        for source, target, edge_data in self.graph.graph.edges(data=True):
+            edge_columns["src"].append(node_index[source])
+            edge_columns["dst"].append(node_index[target])
+            edge_columns["type"].append(edge_data.get("type", "unknown"))
+
+        payload = {
+            "version": 1,
+            "nodes": list(node_index),
+            "edges": edge_columns,
+            "users": self._entities_to_columns(self.graph.users, IAMUser),
+            "roles": self._entities_to_columns(self.graph.roles, IAMRole),
+            "groups": self._entities_to_columns(self.graph.groups, IAMGroup),
+            "policies": self._entities_to_columns(self.graph.policies, IAMPolicy),
+        }
+
+        try:
+            if filename.endswith('.msgpack'):
+                if not HAS_MSGPACK:
+                    raise ImportError(
+                        "msgpack is not available. Install it with: pip install msgpack"
+                    )
+                data = msgpack.packb(payload)
+            else:
+                data = json.dumps(payload).encode()
+            with open(filename, 'wb') as f:
+                f.write(data)
+            logger.info(f"Columnar graph saved to {filename}")
+        except Exception as e:
+            logger.error(f"Error saving columnar graph to {filename}: {e}")
+            raise
+
     def load_graph(self, filename: str) -> IAMGraph:
-        """Load a graph from a pickle file."""
+        """Load a graph from a pickle or columnar file (by extension)."""
         try:
-            with open(filename, 'rb') as f:
-                self.graph = pickle.load(f)
+            if filename.endswith(('.json', '.msgpack')):
+                self.graph = self._load_graph_columnar(filename)
+            elif filename.endswith('.zst'):
+                self.graph = self._load_graph_zstd(filename)
+            else:
+                with open(filename, 'rb') as f:
+                    self.graph = pickle.load(f)
+            self._intern_entity_strings()
             logger.info(f"Graph loaded from {filename}")
             return self.graph
         except Exception as e:
             logger.error(f"Error loading graph from {filename}: {e}")
             raise
+
+    def _load_graph_zstd(self, filename: str) -> IAMGraph:
+        """Load a zstd-compressed pickle written by save_graph."""
+        if not HAS_ZSTD:
+            raise ImportError(
+                "zstandard is not available. Install it with: pip install zstandard"
+            )
+        with open(filename, 'rb') as f:
+            data = zstandard.ZstdDecompressor().decompress(f.read())
+        return pickle.loads(data)
+
+    def _load_graph_columnar(self, filename: str) -> IAMGraph:
+        """Reconstruct a graph from the columnar layout in O(N) bulk ops."""
+        with open(filename, 'rb') as f:
+            data = f.read()
+        if filename.endswith('.msgpack'):
+            if not HAS_MSGPACK:
+                raise ImportError(
+                    "msgpack is not available. Install it with: pip install msgpack"
+                )
+            payload = msgpack.unpackb(data)
+        else:
+            payload = json.loads(data)
+
+        graph = IAMGraph()
+        for columns, adder, entity_cls in (
+                (payload["policies"], graph.add_policy, IAMPolicy),
+                (payload["users"], graph.add_user, IAMUser),
+                (payload["roles"], graph.add_role, IAMRole),
+                (payload["groups"], graph.add_group, IAMGroup)):
+            for entity in self._entities_from_columns(columns, entity_cls):
+                adder(entity)
+
+        # Non-entity nodes (service principals, '*') plus all edges
+        nodes = payload["nodes"]
+        graph.graph.add_nodes_from(n for n in nodes if n not in graph.graph)
+        edges = payload["edges"]
+        graph.graph.add_edges_from(
+            (nodes[src], nodes[dst], {"type": edge_type})
+            for src, dst, edge_type in zip(edges["src"], edges["dst"], edges["type"])
+        )
+        return graph
+
+    @staticmethod
+    def _entities_to_columns(entity_dict: Dict[str, Any], entity_cls) -> Dict[str, list]:
+        """Transpose entity dataclasses into per-field arrays."""
+        entities = list(entity_dict.values())
+        columns = {}
+        for entity_field in fields(entity_cls):
+            values = [getattr(entity, entity_field.name) for entity in entities]
+            if entity_field.name in _DATETIME_FIELDS:
+                values = [value.isoformat() if value else None for value in values]
+            columns[entity_field.name] = values
+        return columns
+
+    @staticmethod
+    def _entities_from_columns(columns: Dict[str, list], entity_cls):
+        """Rebuild entity dataclasses from per-field arrays."""
+        field_names = [entity_field.name for entity_field in fields(entity_cls)]
+        for row in zip(*(columns[name] for name in field_names)):
+            kwargs = dict(zip(field_names, row))
+            for name in _DATETIME_FIELDS & kwargs.keys():
+                if kwargs[name]:
+                    kwargs[name] = datetime.fromisoformat(kwargs[name])
+            yield entity_cls(**kwargs)
@@ -125,6 +125,21 @@ class IAMGraph:
     groups: Dict[str, IAMGroup] = field(default_factory=dict)
     policies: Dict[str, IAMPolicy] = field(default_factory=dict)
     graph: nx.DiGraph = field(default_factory=nx.DiGraph)
+    # Memoized descendant sets per queried source node; lets repeated
+    # reachability checks answer in O(1) instead of re-traversing
+    _reach: Dict[str, Set[str]] = field(default_factory=dict, init=False, repr=False, compare=False)
+
+    def __getstate__(self):
+        # The reachability memo is query-time cache state: keep it out of
+        # pickles so saved graphs stay lean
+        state = self.__dict__.copy()
+        state.pop("_reach", None)
+        return state
+
+    def __setstate__(self, state):
+        # Also restores graphs pickled before the memo existed
+        self.__dict__.update(state)
+        self._reach = {}
 
     def add_user(self, user: IAMUser):
         """Add a user to the graph."""
@@ -147,9 +162,46 @@ class IAMGraph:
         self.graph.add_node(policy.arn, type="policy", name=policy.name, data=policy)
 
     def add_relationship(self, source: str, target: str, relationship_type: str, **kwargs):
-        """Add a relationship between two entities."""
+        """Add a relationship between two entities.
+
+        The underlying DiGraph stores adjacency as dict-of-dicts, so
+        re-adding an edge updates its attributes in place (no duplicates)
+        and neighbor membership tests are O(1).
+        """
+        if self._reach:
+            self._reach.clear()
         self.graph.add_edge(source, target, type=relationship_type, **kwargs)
 
+    def is_reachable(self, source: str, target: str) -> bool:
+        """Check whether target is reachable from source along any path.
+
+        The descendant set of a queried source is computed once and
+        memoized, so the repeated checks an audit run issues become O(1)
+        set lookups; add_relationship invalidates the memo.
+        """
+        if source not in self.graph:
+            return False
+        if source == target:
+            return True
+        reach = self._reach.get(source)
+        if reach is None:
+            # Tight iterative BFS over the adjacency dict: plain set and
+            # list operations in the inner loop instead of the per-edge
+            # generator machinery of nx.descendants
+            adj = self.graph.adj
+            reach = set()
+            frontier = [source]
+            while frontier:
+                next_frontier = []
+                for node in frontier:
+                    for neighbor in adj[node]:
+                        if neighbor not in reach and neighbor != source:
+                            reach.add(neighbor)
+                            next_frontier.append(neighbor)
+                frontier = next_frontier
+            self._reach[source] = reach
+        return target in reach
+
     def get_entity_by_name(self, name: str) -> Optional[Any]:
         """Get an entity by its name."""
         for entity_dict in [self.users, self.roles, self.groups]:
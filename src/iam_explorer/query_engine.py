@@ -4,7 +4,11 @@ Query engine for IAM permission analysis.
 
 import re
 import logging
-from typing import Dict, List, Optional, Any
+import sys
+import threading
+from functools import lru_cache
+from itertools import chain
+from typing import Dict, List, Optional, Set, Any, Tuple
 from fnmatch import fnmatch
 
 from .models import IAMGraph, IAMRole, IAMPolicy
@@ -12,6 +16,17 @@ from .models import IAMGraph, IAMRole, IAMPolicy
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=1024)
+def _compile_action_pattern(pattern: str) -> "re.Pattern":
+    """Compile a wildcard action pattern to an anchored regex, cached.
+
+    Matching-heavy audits test the same handful of patterns against
+    thousands of policy action strings; compiling each distinct pattern
+    once removes the per-call pattern build and regex-cache probe.
+    """
+    return re.compile("^" + pattern.replace("*", ".*") + "$", re.IGNORECASE)
+
+
 class QueryEngine:
     """Engine for querying IAM permissions and relationships."""
 
@@ -23,24 +38,90 @@ class QueryEngine:
             graph: IAMGraph object containing all IAM relationships
         """
         self.graph = graph
-
-    def who_can_do(self, action: str, resource: str = "*") -> List[Dict[str, Any]]:
+        # Inverted action -> principal ARNs index; built on demand via
+        # build_action_index() and used to pre-filter who_can_do scans
+        self._action_index: Optional[Dict[str, Set[str]]] = None
+        # Indexed action patterns bucketed by service prefix ('*' bucket
+        # for wildcard-service patterns); built with the action index
+        self._service_actions: Dict[str, List[str]] = {}
+        # Actions proven to match nobody; the graph is read-only after
+        # construction, so empty results stay empty for repeat queries
+        self._neg_cache: Set[str] = set()
+        # Full who_can_do results keyed by (action, resource); overlapping
+        # wildcard queries ('*', 'iam:*', '*:Delete*') repeat the same
+        # policy-statement scans otherwise. Guarded by a lock so callers
+        # may share one engine across threads.
+        self._result_cache: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        self._cache_lock = threading.Lock()
+        # Formatted display labels ("User: name", "Role: name") per ARN;
+        # every query result rebuilds these otherwise
+        self._label_cache: Dict[str, str] = {}
+
+    def clear_cache(self) -> None:
+        """Drop memoized query results, e.g. after mutating the graph."""
+        with self._cache_lock:
+            self._result_cache.clear()
+            self._neg_cache.clear()
+            self._label_cache.clear()
+            self._action_index = None
+            self._service_actions = {}
+
+    def who_can_do(self, action: str, resource: str = "*",
+                   candidates: Optional[Set[str]] = None,
+                   exclude: Optional[Set[str]] = None) -> List[Dict[str, Any]]:
         """
         Find all entities that can perform a specific action.
 
         Args:
             action: AWS action (e.g., 's3:GetObject', 's3:*')
             resource: Resource ARN or pattern (default: '*')
+            candidates: Optional set of entity ARNs to restrict the scan to,
+                typically from candidates_for_action()
+            exclude: Optional set of entity names to skip, e.g. entities
+                already known to match from a broader query
 
         Returns:
             List of entities that can perform the action
         """
         logger.info(f"Querying who can do action: {action} on resource: {resource}")
 
+        # Only the unrestricted form is safely cacheable; a restricted scan
+        # coming up empty proves nothing about the whole graph
+        cacheable = resource == "*" and candidates is None and exclude is None
+        if cacheable:
+            if action in self._neg_cache:
+                return []
+            cached = self._result_cache.get((action, resource))
+            if cached is not None:
+                return cached
+
+        # When the inverted index has been built, restrict the scan to
+        # principals with at least one Allow statement matching the action
+        # instead of walking every user and role
+        if candidates is None and self._action_index is not None:
+            candidates = set()
+            service = action.split(':', 1)[0].lower() if ':' in action else '*'
+            if '*' in service:
+                indexed_actions = self._action_index.keys()
+            else:
+                # Exact-service queries only need to test patterns from
+                # that service plus wildcard-service patterns, skipping
+                # the bulk of the index outright
+                indexed_actions = chain(
+                    self._service_actions.get(service, ()),
+                    self._service_actions.get('*', ()))
+            for indexed_action in indexed_actions:
+                if self._action_matches(indexed_action, action):
+                    candidates |= self._action_index[indexed_action]
+
         results = []
 
         # Check all users
         for user_arn, user in self.graph.users.items():
+            if candidates is not None and user_arn not in candidates:
+                continue
+            if exclude is not None and user.name in exclude:
+                continue
             if self._can_entity_do_action(user_arn, action, resource):
                 results.append({
                     "type": "user",
@@ -51,6 +132,10 @@ class QueryEngine:
 
         # Check all roles
         for role_arn, role in self.graph.roles.items():
+            if candidates is not None and role_arn not in candidates:
+                continue
+            if exclude is not None and role.name in exclude:
+                continue
             if self._can_entity_do_action(role_arn, action, resource):
                 # Also check who can assume this role
                 assumers = self._who_can_assume_role(role_arn)
@@ -62,9 +147,221 @@ class QueryEngine:
                     "can_be_assumed_by": assumers
                 })
 
+        if cacheable:
+            with self._cache_lock:
+                if not results:
+                    self._neg_cache.add(action)
+                self._result_cache[(action, resource)] = results
+
         logger.info(f"Found {len(results)} entities that can perform {action}")
         return results
 
+    def who_can_do_names(self, action: str, resource: str = "*") -> frozenset:
+        """
+        Find just the names of entities that can perform an action.
+
+        A lighter-weight who_can_do() for callers that only need name sets
+        (e.g. overlap checks): it skips the permission-path and role-assumer
+        lookups and allocates no per-entity dicts.
+
+        Args:
+            action: AWS action (e.g., 's3:GetObject', 's3:*')
+            resource: Resource ARN or pattern (default: '*')
+
+        Returns:
+            Frozen set of entity names that can perform the action
+        """
+        logger.info(f"Querying names of who can do action: {action}")
+
+        names = set()
+        for entity_dict in (self.graph.users, self.graph.roles):
+            for arn, entity in entity_dict.items():
+                if self._can_entity_do_action(arn, action, resource):
+                    names.add(entity.name)
+
+        return frozenset(names)
+
+    def count_who_can_do(self, action: str, resource: str = "*") -> int:
+        """
+        Count entities that can perform an action.
+
+        For call sites that only need how many principals match, this skips
+        the per-entity result dicts, permission paths, and role-assumer
+        lookups that who_can_do() materializes.
+
+        Args:
+            action: AWS action (e.g., 's3:GetObject', 's3:*')
+            resource: Resource ARN or pattern (default: '*')
+
+        Returns:
+            Number of entities that can perform the action
+        """
+        logger.info(f"Counting who can do action: {action}")
+
+        return sum(
+            1
+            for entity_dict in (self.graph.users, self.graph.roles)
+            for arn in entity_dict
+            if self._can_entity_do_action(arn, action, resource)
+        )
+
+    def who_can_do_many(self, actions: List[str],
+                        resource: str = "*") -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Evaluate several who-can-do queries in a single graph traversal.
+
+        Each principal's applicable policies are resolved once and matched
+        against every action pattern, instead of re-traversing the graph
+        once per action as repeated who_can_do() calls would.
+
+        Args:
+            actions: AWS actions or patterns (e.g. ['*', 'iam:*', 's3:DeleteBucket'])
+            resource: Resource ARN or pattern (default: '*')
+
+        Returns:
+            Mapping of each action to its who_can_do()-shaped result list
+        """
+        logger.info(f"Querying who can do {len(actions)} actions in one pass")
+
+        results: Dict[str, List[Dict[str, Any]]] = {action: [] for action in actions}
+        assumer_cache: Dict[str, List[str]] = {}
+
+        for entity_dict, entity_type in ((self.graph.users, "user"),
+                                         (self.graph.roles, "role")):
+            for arn, entity in entity_dict.items():
+                policies = self._get_all_policies_for_entity(arn)
+                for action in actions:
+                    allowing = [p for p in policies
+                                if self._policy_allows_action(p, action, resource)]
+                    if not allowing:
+                        continue
+                    if any(self._policy_denies_action(p, action, resource)
+                           for p in policies):
+                        continue
+                    entry = {
+                        "type": entity_type,
+                        "arn": arn,
+                        "name": entity.name,
+                        "path": [f"Policy: {p.name} ({p.arn})" for p in allowing]
+                    }
+                    if entity_type == "role":
+                        if arn not in assumer_cache:
+                            assumer_cache[arn] = self._who_can_assume_role(arn)
+                        entry["can_be_assumed_by"] = assumer_cache[arn]
+                    results[action].append(entry)
+
+        return results
+
+    def build_action_index(self) -> None:
+        """
+        Build an inverted index from action patterns to principal ARNs.
+
+        Every Allow statement in managed and inline policies is scanned once,
+        mapping each action string (including wildcard patterns like 's3:*')
+        to the entities the policy applies to. Subsequent who_can_do() calls
+        use the index to skip principals that cannot possibly match, turning
+        repeated queries from O(queries x policies) into one policy scan plus
+        cheap per-query merges.
+        """
+        index: Dict[str, Set[str]] = {}
+
+        def _record(policy_document: Dict[str, Any], principals: Set[str]):
+            for statement in policy_document.get("Statement", []):
+                if statement.get("Effect") != "Allow":
+                    continue
+                statement_actions = statement.get("Action", [])
+                if isinstance(statement_actions, str):
+                    statement_actions = [statement_actions]
+                for stmt_action in statement_actions:
+                    index.setdefault(stmt_action, set()).update(principals)
+
+        for policy_arn, policy in self.graph.policies.items():
+            principals = self._principals_for_policy(policy_arn)
+            if principals:
+                _record(policy.policy_document, principals)
+
+        for entity_dict in (self.graph.users, self.graph.roles):
+            for arn, entity in entity_dict.items():
+                for policy_doc in entity.inline_policies.values():
+                    _record(policy_doc, {arn})
+
+        # Bucket the indexed patterns by service prefix so exact-service
+        # queries skip patterns that cannot match; wildcard-service
+        # patterns ('*', '*:Delete*') land in the '*' bucket every
+        # exact-service query also consults
+        by_service: Dict[str, List[str]] = {}
+        for stmt_action in index:
+            service = stmt_action.split(':', 1)[0].lower() if ':' in stmt_action else '*'
+            if '*' in service:
+                service = '*'
+            by_service.setdefault(service, []).append(stmt_action)
+
+        self._action_index = index
+        self._service_actions = by_service
+        logger.info(f"Built action index with {len(index)} action patterns")
+
+    def _principals_for_policy(self, policy_arn: str) -> Set[str]:
+        """Get entity ARNs a policy applies to, expanding groups to members."""
+        principals: Set[str] = set()
+        for source, _, edge_data in self.graph.graph.in_edges(policy_arn, data=True):
+            if edge_data.get("type") != "attached_policy":
+                continue
+            if source in self.graph.groups:
+                group_name = self.graph.groups[source].name
+                for user_arn, user in self.graph.users.items():
+                    if group_name in user.groups:
+                        principals.add(user_arn)
+            else:
+                principals.add(source)
+        return principals
+
+    def candidates_for_action(self, action: str) -> Optional[Set[str]]:
+        """
+        Find entity ARNs with an Allow statement that could match the action.
+
+        This is a pre-filter over policy documents that restricts a
+        who_can_do() scan to principals that could plausibly match, instead
+        of traversing the whole graph. Statement actions are tested with the
+        same wildcard matching the full scan uses, so patterns like 's3*'
+        are never filtered out.
+
+        Args:
+            action: AWS action with a concrete service prefix (e.g. 's3:DeleteBucket')
+
+        Returns:
+            Set of candidate entity ARNs, or None when the action has a
+            wildcard service and no useful pre-filter exists
+        """
+        if ":" not in action or action.split(":", 1)[0].endswith("*"):
+            return None
+
+        def _could_allow(policy_document: Dict[str, Any]) -> bool:
+            for statement in policy_document.get("Statement", []):
+                if statement.get("Effect") != "Allow":
+                    continue
+                statement_actions = statement.get("Action", [])
+                if isinstance(statement_actions, str):
+                    statement_actions = [statement_actions]
+                for stmt_action in statement_actions:
+                    if self._action_matches(stmt_action, action):
+                        return True
+            return False
+
+        candidates = set()
+
+        # Principals attached (directly or via groups) to a matching policy
+        for policy_arn, policy in self.graph.policies.items():
+            if _could_allow(policy.policy_document):
+                candidates |= self._principals_for_policy(policy_arn)
+
+        # Inline policies live on the entities themselves
+        for entity_dict in (self.graph.users, self.graph.roles):
+            for arn, entity in entity_dict.items():
+                if any(_could_allow(doc) for doc in entity.inline_policies.values()):
+                    candidates.add(arn)
+
+        return candidates
+
     def what_can_entity_do(self, entity_name: str) -> Dict[str, Any]:
         """
         Find all actions an entity can perform.
@@ -76,7 +373,31 @@ class QueryEngine:
             Dictionary containing all allowed and denied actions
         """
         logger.info(f"Querying what {entity_name} can do")
+        return self._what_can_entity_do(entity_name)
+
+    def what_can_entities_do(self, entity_names: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Batch form of what_can_entity_do for several entities.
+
+        Attached-policy lookups are memoized across the batch, so policies
+        and groups shared between the entities are resolved once instead of
+        once per entity.
+
+        Args:
+            entity_names: Names of users, roles, or groups
+
+        Returns:
+            Mapping of each name to its what_can_entity_do() result
+        """
+        logger.info(f"Querying what {len(entity_names)} entities can do")
 
+        policy_memo: Dict[str, List[IAMPolicy]] = {}
+        return {name: self._what_can_entity_do(name, policy_memo)
+                for name in entity_names}
+
+    def _what_can_entity_do(self, entity_name: str,
+                            policy_memo: Optional[Dict[str, List[IAMPolicy]]] = None) -> Dict[str, Any]:
+        """Resolve an entity's actions, optionally sharing a policy memo."""
         entity = self.graph.get_entity_by_name(entity_name)
         if not entity:
             return {"error": f"Entity '{entity_name}' not found"}
@@ -86,11 +407,14 @@ class QueryEngine:
         denied_actions = set()
 
         # Get all policies for this entity
-        policies = self._get_all_policies_for_entity(entity_arn)
+        policies = self._get_all_policies_for_entity(entity_arn, policy_memo)
 
+        # Intern the action strings: entities typically share policies, so
+        # the per-entity action sets reference one copy of each action and
+        # set operations on them hash interned pointers
         for policy in policies:
-            allowed_actions.update(policy.get_allowed_actions())
-            denied_actions.update(policy.get_denied_actions())
+            allowed_actions.update(map(sys.intern, policy.get_allowed_actions()))
+            denied_actions.update(map(sys.intern, policy.get_denied_actions()))
 
         # If it's a role, also check what roles it can assume
         assumable_roles = []
@@ -147,12 +471,25 @@ class QueryEngine:
         # Deny always wins
         return is_allowed and not is_denied
 
-    def _get_all_policies_for_entity(self, entity_arn: str) -> List[IAMPolicy]:
-        """Get all policies that apply to an entity (direct, group, inline)."""
+    def _get_all_policies_for_entity(self, entity_arn: str,
+                                     policy_memo: Optional[Dict[str, List[IAMPolicy]]] = None) -> List[IAMPolicy]:
+        """Get all policies that apply to an entity (direct, group, inline).
+
+        When a policy_memo dict is supplied, attached-policy lookups are
+        served from it so batched queries expand shared groups and policies
+        only once.
+        """
+        def _attached(arn: str) -> List[IAMPolicy]:
+            if policy_memo is None:
+                return self.graph.get_policies_for_entity(arn)
+            if arn not in policy_memo:
+                policy_memo[arn] = self.graph.get_policies_for_entity(arn)
+            return policy_memo[arn]
+
         policies = []
 
         # Direct attached policies
-        policies.extend(self.graph.get_policies_for_entity(entity_arn))
+        policies.extend(_attached(entity_arn))
 
         # If it's a user, also get group policies
         if entity_arn in self.graph.users:
@@ -160,7 +497,7 @@ class QueryEngine:
             for group_name in user.groups:
                 group_arn = self._find_group_arn_by_name(group_name)
                 if group_arn:
-                    policies.extend(self.graph.get_policies_for_entity(group_arn))
+                    policies.extend(_attached(group_arn))
 
         # Add inline policies
         entity = self._get_entity_by_arn(entity_arn)
@@ -229,13 +566,11 @@ class QueryEngine:
         """Check if a policy action matches a query action."""
         # If query action has wildcards, check if policy action matches the pattern
         if "*" in query_action:
-            query_pattern = query_action.replace("*", ".*")
-            return bool(re.match(f"^{query_pattern}$", policy_action, re.IGNORECASE))
+            return _compile_action_pattern(query_action).match(policy_action) is not None
 
         # If policy action has wildcards, check if it covers the query action
         if "*" in policy_action:
-            policy_pattern = policy_action.replace("*", ".*")
-            return bool(re.match(f"^{policy_pattern}$", query_action, re.IGNORECASE))
+            return _compile_action_pattern(policy_action).match(query_action) is not None
 
         # Exact match
         return policy_action.lower() == query_action.lower()
@@ -266,16 +601,28 @@ class QueryEngine:
         # Look for incoming "can_assume" edges
         for edge in self.graph.graph.in_edges(role_arn, data=True):
             if edge[2].get("type") == "can_assume":
-                source_arn = edge[0]
-                if source_arn in self.graph.users:
-                    assumers.append(f"User: {self.graph.users[source_arn].name}")
-                elif source_arn in self.graph.roles:
-                    assumers.append(f"Role: {self.graph.roles[source_arn].name}")
-                else:
-                    assumers.append(f"Service/Other: {source_arn}")
+                assumers.append(self._entity_label(edge[0]))
 
         return assumers
 
+    def _entity_label(self, arn: str) -> str:
+        """Format the display label for an ARN, memoized per engine.
+
+        The same "User: name" / "Role: name" strings appear in every
+        query result that mentions an entity; formatting them once per
+        ARN avoids rebuilding identical strings on repeat queries.
+        """
+        label = self._label_cache.get(arn)
+        if label is None:
+            if arn in self.graph.users:
+                label = f"User: {self.graph.users[arn].name}"
+            elif arn in self.graph.roles:
+                label = f"Role: {self.graph.roles[arn].name}"
+            else:
+                label = f"Service/Other: {arn}"
+            self._label_cache[arn] = label
+        return label
+
     def _get_assumable_roles(self, entity_arn: str) -> List[str]:
         """Get roles that an entity can assume."""
         assumable = []
@@ -285,7 +632,7 @@ class QueryEngine:
             if edge[2].get("type") == "can_assume":
                 target_arn = edge[1]
                 if target_arn in self.graph.roles:
-                    assumable.append(f"Role: {self.graph.roles[target_arn].name}")
+                    assumable.append(self._entity_label(target_arn))
 
         return assumable
 
@@ -46,13 +46,14 @@ class GraphVisualizer:
             'permission_boundary': '#E17055'   # Orange
         }
 
-    def generate_dot(self, output_file: str, include_policies: bool = True,
+    def generate_dot(self, output_file: Any, include_policies: bool = True,
                      filter_entities: Optional[List[str]] = None):
         """
         Generate a DOT file for Graphviz visualization.
 
         Args:
-            output_file: Path to output DOT file
+            output_file: Path to output DOT file, or an open file-like object
+                (callers can pass a writer with a large buffer for big graphs)
             include_policies: Whether to include policy nodes
             filter_entities: List of entity names to include (None for all)
         """
@@ -79,10 +80,13 @@ class GraphVisualizer:
         # Add edges
         self._add_dot_edges(dot, entities_to_include, include_policies)
 
-        # Save to file
+        # Save to file (or write into the caller-supplied file object)
         try:
-            with open(output_file, 'w') as f:
-                f.write(dot.source)
+            if hasattr(output_file, 'write'):
+                output_file.write(dot.source)
+            else:
+                with open(output_file, 'w') as f:
+                    f.write(dot.source)
             logger.info(f"DOT file saved to {output_file}")
         except Exception as e:
             logger.error(f"Error saving DOT file: {e}")
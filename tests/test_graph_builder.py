@@ -153,6 +153,41 @@ class TestGraphBuilder:
         assert len(graph.groups) > 0
         assert len(graph.policies) > 0
 
+    def test_columnar_roundtrip(self, tmp_path):
+        """Test saving and loading the columnar graph format."""
+        test_data = {
+            "users": [
+                {
+                    "arn": "arn:aws:iam::123456789012:user/alice",
+                    "name": "alice",
+                    "user_id": "AIDACKCEVSQ6C2EXAMPLE",
+                    "create_date": "2023-01-01T00:00:00",
+                    "attached_policies": ["arn:aws:iam::123456789012:policy/TestPolicy"],
+                    "groups": [],
+                }
+            ],
+            "policies": [
+                {
+                    "arn": "arn:aws:iam::123456789012:policy/TestPolicy",
+                    "name": "TestPolicy",
+                    "policy_document": {},
+                    "create_date": "2023-01-01T00:00:00",
+                }
+            ],
+        }
+
+        graph = self.builder.build_from_data(test_data)
+        path = str(tmp_path / "graph.json")
+        self.builder.save_graph_columnar(path)
+
+        loaded = GraphBuilder().load_graph(path)
+
+        assert set(loaded.users) == set(graph.users)
+        assert set(loaded.policies) == set(graph.policies)
+        assert set(loaded.graph.nodes) == set(graph.graph.nodes)
+        assert set(loaded.graph.edges) == set(graph.graph.edges)
+        assert loaded.users["arn:aws:iam::123456789012:user/alice"].create_date == datetime(2023, 1, 1)
+
     def test_create_users(self):
         """Test creating users."""
         users_data = [
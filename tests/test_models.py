@@ -2,7 +2,9 @@
 Tests for IAM Explorer models.
 """
 
-from iam_explorer.models import IAMUser, IAMRole, IAMPolicy, IAMGraph
+import pickle
+
+from iam_explorer.models import IAMUser, IAMRole, IAMGroup, IAMPolicy, IAMGraph
 
 
 class TestIAMPolicy:
@@ -182,6 +184,76 @@ class TestIAMGraph:
         edge_data = graph.graph.get_edge_data(user.arn, policy.arn)
         assert edge_data["type"] == "attached_policy"
 
+        # Re-adding the same edge dedupes instead of duplicating
+        graph.add_relationship(user.arn, policy.arn, "attached_policy")
+        assert len(graph.graph.edges) == 1
+
+    def test_is_reachable(self):
+        """Test memoized reachability queries."""
+        graph = IAMGraph()
+
+        user = IAMUser(arn="arn:aws:iam::123456789012:user/test-user", name="test-user", user_id="AIDAEXAMPLE123456789")
+        graph.add_user(user)
+
+        group = IAMGroup(
+            arn="arn:aws:iam::123456789012:group/test-group", name="test-group", group_id="AGPAEXAMPLE123456789"
+        )
+        graph.add_group(group)
+
+        policy = IAMPolicy(
+            arn="arn:aws:iam::123456789012:policy/test-policy",
+            name="test-policy",
+            policy_document={"Version": "2012-10-17", "Statement": []},
+        )
+        graph.add_policy(policy)
+
+        graph.add_relationship(user.arn, group.arn, "member_of")
+        graph.add_relationship(group.arn, policy.arn, "attached_policy")
+
+        # Transitive path: user -> group -> policy
+        assert graph.is_reachable(user.arn, policy.arn)
+        assert graph.is_reachable(user.arn, user.arn)
+        # Edges are directed
+        assert not graph.is_reachable(policy.arn, user.arn)
+        assert not graph.is_reachable("unknown", policy.arn)
+
+        # New edges invalidate the memo
+        role = IAMRole(arn="arn:aws:iam::123456789012:role/test-role", name="test-role", role_id="AROAEXAMPLE123456789")
+        graph.add_role(role)
+        assert not graph.is_reachable(user.arn, role.arn)
+        graph.add_relationship(policy.arn, role.arn, "can_assume")
+        assert graph.is_reachable(user.arn, role.arn)
+
+    def test_pickle_excludes_reachability_memo(self):
+        """Test that pickling drops the memo and old pickles still load."""
+        graph = IAMGraph()
+
+        user = IAMUser(arn="arn:aws:iam::123456789012:user/test-user", name="test-user", user_id="AIDAEXAMPLE123456789")
+        graph.add_user(user)
+
+        policy = IAMPolicy(
+            arn="arn:aws:iam::123456789012:policy/test-policy",
+            name="test-policy",
+            policy_document={"Version": "2012-10-17", "Statement": []},
+        )
+        graph.add_policy(policy)
+        graph.add_relationship(user.arn, policy.arn, "attached_policy")
+
+        # Populate the memo, then round-trip
+        assert graph.is_reachable(user.arn, policy.arn)
+        assert graph._reach
+
+        restored = pickle.loads(pickle.dumps(graph))
+        assert restored._reach == {}
+        assert restored.is_reachable(user.arn, policy.arn)
+
+        # Graphs pickled before the memo existed have no _reach in their
+        # state; they must restore and answer queries all the same
+        legacy = IAMGraph.__new__(IAMGraph)
+        legacy.__setstate__({k: v for k, v in vars(graph).items() if k != "_reach"})
+        legacy.add_relationship(policy.arn, user.arn, "example")
+        assert legacy.is_reachable(user.arn, policy.arn)
+
     def test_get_entity_by_name(self):
         """Test finding entities by name."""
         graph = IAMGraph()
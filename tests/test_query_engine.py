@@ -158,6 +158,128 @@ class TestQueryEngine:
         results = engine.who_can_do("ec2:DescribeInstances")
         assert len(results) == 0  # No entities have EC2 permissions
 
+    def test_who_can_do_names(self, sample_graph):
+        """Test the name-set variant of who-can-do."""
+        engine = QueryEngine(sample_graph)
+
+        names = engine.who_can_do_names("s3:GetObject")
+        assert isinstance(names, frozenset)
+        assert names == {"test-user", "test-role"}
+        assert engine.who_can_do_names("ec2:DescribeInstances") == frozenset()
+
+    def test_count_who_can_do(self, sample_graph):
+        """Test the count-only variant of who-can-do."""
+        engine = QueryEngine(sample_graph)
+
+        assert engine.count_who_can_do("s3:GetObject") == 2
+        assert engine.count_who_can_do("s3:DeleteObject") == 0
+        assert engine.count_who_can_do("ec2:DescribeInstances") == 0
+
+    def test_who_can_do_many(self, sample_graph):
+        """Test batched multi-action who-can-do queries."""
+        engine = QueryEngine(sample_graph)
+
+        actions = ["s3:GetObject", "s3:DeleteObject", "ec2:DescribeInstances"]
+        batched = engine.who_can_do_many(actions)
+
+        # One traversal must produce the same answers as per-action queries
+        assert set(batched.keys()) == set(actions)
+        for action in actions:
+            assert batched[action] == engine.who_can_do(action)
+
+    def test_what_can_entities_do(self, sample_graph):
+        """Test batched what-can-entity-do queries."""
+        engine = QueryEngine(sample_graph)
+
+        batched = engine.what_can_entities_do(["test-user", "test-role", "missing"])
+
+        assert batched["test-user"] == engine.what_can_entity_do("test-user")
+        assert batched["test-role"] == engine.what_can_entity_do("test-role")
+        assert "error" in batched["missing"]
+
+    def test_build_action_index(self, sample_graph):
+        """Test that the inverted action index preserves query results."""
+        engine = QueryEngine(sample_graph)
+        expected = engine.who_can_do("s3:GetObject")
+
+        engine.build_action_index()
+        assert "s3:GetObject" in engine._action_index
+        # Patterns are bucketed by service for exact-service short-circuits
+        assert "s3:GetObject" in engine._service_actions["s3"]
+
+        # Index-filtered scans must match the unfiltered ones
+        assert engine.who_can_do("s3:GetObject") == expected
+        assert engine.who_can_do("ec2:DescribeInstances") == []
+        # The role's deny on s3:DeleteObject excludes it from s3:*
+        assert [r["name"] for r in engine.who_can_do("s3:*")] == ["test-user"]
+
+    def test_who_can_do_memoized(self, sample_graph):
+        """Test that repeated unrestricted queries hit the result cache."""
+        engine = QueryEngine(sample_graph)
+
+        first = engine.who_can_do("s3:GetObject")
+        # A repeat query is served from the memo, not a fresh traversal
+        assert engine.who_can_do("s3:GetObject") is first
+
+        # Restricted queries bypass the cache entirely
+        restricted = engine.who_can_do("s3:GetObject", exclude={"test-user"})
+        assert restricted is not first
+
+        engine.clear_cache()
+        again = engine.who_can_do("s3:GetObject")
+        assert again is not first
+        assert again == first
+
+    def test_candidates_for_action(self, sample_graph):
+        """Test candidate pre-filtering for who-can-do queries."""
+        engine = QueryEngine(sample_graph)
+
+        # Both entities have s3 policies attached
+        candidates = engine.candidates_for_action("s3:GetObject")
+        assert "arn:aws:iam::123456789012:user/test-user" in candidates
+        assert "arn:aws:iam::123456789012:role/test-role" in candidates
+
+        # No entity mentions EC2
+        assert engine.candidates_for_action("ec2:DescribeInstances") == set()
+
+        # Wildcard-service patterns cannot be pre-filtered
+        assert engine.candidates_for_action("*") is None
+        assert engine.candidates_for_action("*:Delete*") is None
+
+        # Restricting the scan must not change results for matching candidates
+        results = engine.who_can_do("s3:GetObject", candidates=candidates)
+        assert len(results) == 2
+
+    def test_candidates_for_action_wildcard_service_pattern(self, sample_graph):
+        """Test that 's3*'-style statement patterns survive pre-filtering."""
+        policy = IAMPolicy(
+            arn="arn:aws:iam::123456789012:policy/s3-star",
+            name="s3-star",
+            policy_document={
+                "Version": "2012-10-17",
+                "Statement": [{"Effect": "Allow", "Action": "s3*", "Resource": "*"}],
+            },
+        )
+        sample_graph.add_policy(policy)
+
+        user = IAMUser(
+            arn="arn:aws:iam::123456789012:user/star-user",
+            name="star-user",
+            user_id="AIDAEXAMPLE987654321",
+        )
+        sample_graph.add_user(user)
+        sample_graph.add_relationship(user.arn, policy.arn, "attached_policy")
+
+        engine = QueryEngine(sample_graph)
+
+        # The pattern has a wildcard before the colon, so a raw service
+        # prefix check would miss it
+        candidates = engine.candidates_for_action("s3:DeleteBucket")
+        assert user.arn in candidates
+
+        results = engine.who_can_do("s3:DeleteBucket", candidates=candidates)
+        assert any(r["name"] == "star-user" for r in results)
+
     def test_get_permission_path(self, sample_graph):
         """Test getting permission paths."""
         engine = QueryEngine(sample_graph)